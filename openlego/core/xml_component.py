@@ -22,23 +22,40 @@ from __future__ import absolute_import, division, print_function
 import abc
 import os
 import io
+import itertools
 import re
+import uuid
 from abc import abstractmethod
-from datetime import datetime
-from cached_property import cached_property
+from collections import OrderedDict
+try:
+    from functools import cached_property
+except ImportError:
+    from cached_property import cached_property
 
 import numpy as np
 from lxml import etree
+from six import string_types, binary_type, text_type
+from six.moves import intern
 from openmdao.api import Group, IndepVarComp, ExplicitComponent
 from openmdao.vectors.vector import Vector
-from typing import Optional, List, Union, Iterable, Tuple
+from typing import Optional, List, Union, Iterable, Iterator, Tuple, Any, IO
 
-from openlego.utils.xml_utils import xml_safe_create_element, xml_to_dict, xpath_to_param, param_to_xpath, xml_merge
-from openlego.utils.general_utils import is_float
+from openlego.utils.xml_utils import xml_to_dict, xml_iter_values, xml_write_values, xml_write_steps, xpath_to_param, \
+    param_to_xpath, xml_merge
+from openlego.utils.general_utils import is_float, parse_string
 from openlego.partials.partials import Partials
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
-parser = etree.XMLParser(remove_blank_text=True)
+# ID attributes are never looked up, and tool output files may easily exceed the default size limits of libxml2
+parser = etree.XMLParser(remove_blank_text=True, collect_ids=False, huge_tree=True)
+
+# Token and counter shared by all components, making the temporary file names of each execution unique. Together with
+# the process id, the random token also distinguishes a later process which happens to get the same id.
+file_token = uuid.uuid4().hex[:8]
+file_counter = itertools.count()
+
+# Regular expression matching the tag of the last element of an XPath, without any attributes or index
+re_xpath_tail = re.compile(r'([^/\[]*)[^/]*$')
 
 
 class XMLComponent(ExplicitComponent):
@@ -107,9 +124,27 @@ class XMLComponent(ExplicitComponent):
         """
         super(XMLComponent, self).__init__()
 
-        self.inputs_from_xml = dict()
-        self.outputs_from_xml = dict()
+        self.inputs_from_xml = OrderedDict()
+        self.outputs_from_xml = OrderedDict()
         self.partials_from_xml = dict()
+        self._variables_from_xml = None     # type: Optional[dict]
+
+        # Tables derived from the XML params, filled during setup:
+        # - (param, xpath, is_discrete) for each XML input param, in file order
+        # - steps to write all XML input params, or only the continuous ones, as input XML file
+        # - XML output param -> ((renamed) output name, is_discrete)
+        # - (of, wrt) params of the partials XML template -> name of the declared partial, as (of param, wrt param)
+        # - and the method used by compute() to execute the discipline
+        self._input_xpath_table = list()    # type: List[Tuple[str, str, bool]]
+        self._input_write_steps = list()
+        self._cont_input_write_steps = list()
+        self._output_dispatch = dict()
+        self._partial_targets = dict()
+        self._compute_impl = None
+
+        # In-memory in- and output XML files, used when the XML files are not kept
+        self._input_buf = io.BytesIO()
+        self._output_buf = io.BytesIO()
 
         if input_xml is not None:
             self.set_inputs_from_xml(input_xml)
@@ -137,6 +172,7 @@ class XMLComponent(ExplicitComponent):
                 Path to or an `etree._ElementTree` of an input XML file.
         """
         self.inputs_from_xml.clear()
+        self._clear_xml_caches()
         for xpath, value in xml_to_dict(input_xml).items():
             name = xpath_to_param(xpath)
             self.inputs_from_xml.update({name: value})
@@ -154,6 +190,7 @@ class XMLComponent(ExplicitComponent):
                 Path to or an `etree._ElementTree` of an output XML file.
         """
         self.outputs_from_xml.clear()
+        self._clear_xml_caches()
         for xpath, value in xml_to_dict(output_xml).items():
             name = xpath_to_param(xpath)
             self.outputs_from_xml.update({name: value})
@@ -168,20 +205,35 @@ class XMLComponent(ExplicitComponent):
                 Path to or an `etree._ElementTree` of a partials XML file.
         """
         self.partials_from_xml.clear()
+        self._variables_from_xml = None
         if partial_xml is not None:
-            partials = Partials(partial_xml)
-            self.partials_from_xml = partials.get_partials().copy()
+            # get_partials() builds a new dict, which is therefore owned by this component without copying it
+            self.partials_from_xml = Partials(partial_xml).get_partials()
+
+    def _clear_xml_caches(self):
+        # type: () -> None
+        """Clear everything derived from the XML in- and outputs, such that it is derived again when needed."""
+        self._variables_from_xml = None
+        for name in ('_classified', 'output_rename_map', 'discrete_output_rename_map'):
+            self.__dict__.pop(name, None)
 
     @property
     def variables_from_xml(self):
         # type: () -> dict
-        """:obj:`dict`: Dictionary of all XML inputs and outputs."""
-        variables = self.inputs_from_xml.copy()
-        variables.update(self.outputs_from_xml.copy())
-        return variables
+        """:obj:`dict`: Dictionary of all XML inputs and outputs. It is shared between calls, so do not modify it."""
+        if self._variables_from_xml is None:
+            variables = self.inputs_from_xml.copy()
+            variables.update(self.outputs_from_xml)
+            self._variables_from_xml = variables
+        return self._variables_from_xml
 
     @cached_property
-    def _input_names(self):
+    def _classified(self):
+        # type: () -> Tuple[frozenset, frozenset, frozenset, frozenset]
+        """Names of the continuous and discrete XML inputs and of the continuous and discrete XML outputs.
+
+        Each XML param is classified exactly once, so `is_float()` does not need to be called again afterwards.
+        """
         input_names = set()
         discrete_input_names = set()
         for name, value in self.inputs_from_xml.items():
@@ -190,7 +242,16 @@ class XMLComponent(ExplicitComponent):
             else:
                 input_names.add(name)
 
-        return input_names, discrete_input_names
+        output_names = set()
+        discrete_output_names = set()
+        for name, value in self.outputs_from_xml.items():
+            if not is_float(value):
+                discrete_output_names.add(name)
+            else:
+                output_names.add(name)
+
+        return frozenset(input_names), frozenset(discrete_input_names), \
+            frozenset(output_names), frozenset(discrete_output_names)
 
     @cached_property
     def output_rename_map(self):
@@ -198,25 +259,31 @@ class XMLComponent(ExplicitComponent):
         Dict mapping original output params to renamed output params.
         Outputs are renamed if they confict with an input parameter.
         """
-        input_names, discrete_input_names = self._input_names
+        input_names, discrete_input_names, output_names, _ = self._classified
 
+        # Only outputs which are also inputs need to be renamed, which usually are none at all
+        conflicts = output_names.intersection(input_names | discrete_input_names)
         output_rename_map = {}
-        for name, value in self.outputs_from_xml.items():
-            if is_float(value):
-                # Use the value stored in the input.xml as a reference value
-                if isinstance(value, np.ndarray):
-                    ref = value.mean()
-                else:
-                    ref = value
-                if ref == 0.:
-                    ref = 1.
+        if not conflicts:
+            return output_rename_map
+
+        # Keep the order of the output XML template
+        outputs_from_xml = self.outputs_from_xml
+        for name in [name for name in outputs_from_xml if name in conflicts]:
+            if name in discrete_input_names:
+                raise RuntimeError('Output not same type (cont) as input (discrete): %s' % name)
+
+            # Use the value stored in the input.xml as a reference value
+            value = outputs_from_xml[name]
+            if isinstance(value, np.ndarray):
+                ref = value.mean()
+            else:
+                ref = value
+            if ref == 0.:
+                ref = 1.
 
-                # Rename output variable if in conflict with input
-                if name in discrete_input_names:
-                    raise RuntimeError('Output not same type (cont) as input (discrete): %s' % name)
-                elif name in input_names:
-                    renamed = name + '___out'
-                    output_rename_map[name] = (renamed, value, ref)
+            renamed = intern(name + '___out')
+            output_rename_map[name] = (renamed, value, ref)
 
         return output_rename_map
 
@@ -226,43 +293,59 @@ class XMLComponent(ExplicitComponent):
         Dict mapping original output params to renamed output params.
         Outputs are renamed if they confict with an input parameter.
         """
-        input_names, discrete_input_names = self._input_names
+        input_names, discrete_input_names, _, discrete_output_names = self._classified
 
+        # Only outputs which are also inputs need to be renamed, which usually are none at all
+        conflicts = discrete_output_names.intersection(input_names | discrete_input_names)
         discrete_output_rename_map = {}
-        for name, value in self.outputs_from_xml.items():
-            if not is_float(value):
-                # Rename output variable if in conflict with input
-                if name in input_names:
-                    raise RuntimeError('Output not same type (discrete) as input (cont): %s' % name)
-                elif name in discrete_input_names:
-                    renamed = name + '___out'
-                    discrete_output_rename_map[name] = (renamed, value)
+        if not conflicts:
+            return discrete_output_rename_map
+
+        # Keep the order of the output XML template
+        outputs_from_xml = self.outputs_from_xml
+        for name in [name for name in outputs_from_xml if name in conflicts]:
+            if name in input_names:
+                raise RuntimeError('Output not same type (discrete) as input (cont): %s' % name)
+
+            renamed = intern(name + '___out')
+            discrete_output_rename_map[name] = (renamed, outputs_from_xml[name])
 
         return discrete_output_rename_map
 
     def setup(self):
+        _, discrete_input_names, _, discrete_output_names = self._classified
+
         has_cont_input = False
-        input_names = set()
-        discrete_input_names = set()
+        input_xpath_table = self._input_xpath_table
+        del input_xpath_table[:]
         for name, value in self.inputs_from_xml.items():
-            if not is_float(value):
+            if name in discrete_input_names:
                 self.add_discrete_input(name, value)
-                discrete_input_names.add(name)
+                input_xpath_table.append((name, param_to_xpath(name), True))
             else:
                 self.add_input(name, value)
-                input_names.add(name)
+                input_xpath_table.append((name, param_to_xpath(name), False))
                 has_cont_input = True
 
+        # Walk the input XPaths once, such that writing an input file only opens the elements each XPath adds
+        self._input_write_steps = list(xml_write_steps(xpath for _, xpath, _ in input_xpath_table))
+        self._cont_input_write_steps = list(xml_write_steps(
+            xpath for _, xpath, is_discrete in input_xpath_table if not is_discrete))
+
         has_cont_output = False
         output_rename_map = self.output_rename_map
         discrete_output_rename_map = self.discrete_output_rename_map
-        for name, value in self.outputs_from_xml.items():
-            if not is_float(value):
+        output_dispatch = self._output_dispatch
+        output_dispatch.clear()
+        for param, value in self.outputs_from_xml.items():
+            name = param
+            if param in discrete_output_names:
                 # Rename output variable if in conflict with input
                 if name in discrete_output_rename_map:
                     name = discrete_output_rename_map[name][0]
 
                 self.add_discrete_output(name, value)
+                output_dispatch[param] = (name, True)
 
             else:
                 # Use the value stored in the input.xml as a reference value
@@ -278,17 +361,25 @@ class XMLComponent(ExplicitComponent):
                     name = output_rename_map[name][0]
 
                 self.add_output(name, value, ref=ref)
+                output_dispatch[param] = (name, False)
                 has_cont_output = True
 
         # Only declare partials if we have at least one continuous input and output parameter
+        partial_targets = self._partial_targets
+        partial_targets.clear()
         if has_cont_input and has_cont_output:
             if self.partials_from_xml:
-                for of, wrt in self.partials_from_xml.items():
-                    if of is not None and wrt is not None:
-                        out_param = xpath_to_param(of)
+                for of, wrts in self.partials_from_xml.items():
+                    if of is not None and wrts is not None:
+                        of_param = out_param = xpath_to_param(of)
                         if out_param in output_rename_map:
                             out_param = output_rename_map[out_param][0]
-                        self.declare_partials(out_param, [xpath_to_param(_wrt) for _wrt in wrt.keys()])
+                        wrt_params = []
+                        for wrt in wrts:
+                            wrt_param = xpath_to_param(wrt)
+                            wrt_params.append(wrt_param)
+                            partial_targets[(of_param, wrt_param)] = (out_param, wrt_param)
+                        self.declare_partials(out_param, wrt_params)
                 # OpenMDAO always uses the compute_partials function if given (even if finite-difference is specified)
                 # Therefore, we only set it here
                 self.compute_partials = self.compute_partials_function
@@ -301,15 +392,26 @@ class XMLComponent(ExplicitComponent):
                     step_calc = self.discipline.step_calc
                 self.declare_partials('*', '*', method='fd', step=step, step_calc=step_calc)
 
+        # Select the way in which compute() executes the discipline, which does not change between executions
+        if hasattr(self.discipline, 'execute_fast'):
+            self._compute_impl = self._compute_fast
+        elif not self.keep_files:
+            self._compute_impl = self._compute_membuf
+        else:
+            self._compute_impl = self._compute_tempfile
+
     @abstractmethod
     def execute(self, input_xml=None, output_xml=None):
         # type: (Optional[str], Optional[str]) -> None
         """Execute the tool using the given input XML file. Write the results to the given output XML file.
 
+        Unless the files are kept, in-memory file objects are given instead of paths. These are reused for every
+        execution, so implementations must not close them.
+
         Parameters
         ----------
-            input_xml, output_xml : str, optional
-                Path to the input, resp. output, XML file.
+            input_xml, output_xml : str or file, optional
+                Path to or file object of the input, resp. output, XML file.
         """
         raise NotImplementedError
 
@@ -341,13 +443,59 @@ class XMLComponent(ExplicitComponent):
                 Partials XML file path.
 
         """
-        salt = datetime.now().strftime('%Y%m%d%H%M%f')
-        input_xml = os.path.join(self.data_folder, self.name + '_in_%s.xml' % salt)
-        output_xml = os.path.join(self.data_folder, self.name + '_out_%s.xml' % salt)
-        partials_xml = os.path.join(self.data_folder, self.name + '_partials_%s.xml' % salt)
+        salt = '%d_%s_%d.xml' % (os.getpid(), file_token, next(file_counter))
+        base = os.path.join(self.data_folder, self.name)
+        input_xml = base + '_in_' + salt
+        output_xml = base + '_out_' + salt
+        partials_xml = base + '_partials_' + salt
 
         return input_xml, output_xml, partials_xml
 
+    def get_input_values(self, inputs, discrete_inputs=None):
+        # type: (Vector, Optional[dict]) -> OrderedDict
+        """Get the current values of all XML inputs with their XPaths as keys.
+
+        Parameters
+        ----------
+            inputs : Vector
+                Input vector of this `Component`.
+
+            discrete_inputs : dict
+                Discrete (i.e. not treated as floats) inputs.
+
+        Returns
+        -------
+            :obj:`OrderedDict`
+                `OrderedDict` of the input values in the order of the input XML template.
+        """
+        return OrderedDict(self._iter_input_values(inputs, discrete_inputs))
+
+    def _iter_input_values(self, inputs, discrete_inputs=None):
+        # type: (Vector, Optional[dict]) -> Iterator[Tuple[str, Any]]
+        """Iterate over the XPaths and current values of all XML inputs in the order of the input XML template."""
+        if discrete_inputs is None:
+            for param, xpath, is_discrete in self._input_xpath_table:
+                if not is_discrete:
+                    yield xpath, inputs[param]
+        else:
+            # Select the source of each value by its discreteness, which is known from setup
+            sources = (inputs, discrete_inputs)
+            for param, xpath, is_discrete in self._input_xpath_table:
+                yield xpath, sources[is_discrete][param]
+
+    def _store_output_values(self, values, outputs, discrete_outputs=None):
+        # type: (Iterable[Tuple[str, Any]], Vector, Optional[dict]) -> None
+        """Store the values of the XML outputs among the given (XPath, value) pairs in the output vectors."""
+        output_dispatch = self._output_dispatch
+        targets = (outputs, discrete_outputs)
+        for xpath, value in values:
+            entry = output_dispatch.get(xpath_to_param(xpath))
+            if entry is not None:
+                name, is_discrete = entry
+                target = targets[is_discrete]
+                if target is not None:
+                    target[name] = value
+
     def write_input_file(self, file, inputs, discrete_inputs=None):
         # type: (Union[str, etree._ElementTree], Vector, Optional[dict]) -> None
         """Write the current input values to an input XML file.
@@ -363,19 +511,12 @@ class XMLComponent(ExplicitComponent):
             discrete_inputs : dict
                 Discrete (i.e. not treated as floats) inputs.
         """
-        # Create new root element and an ElementTree
-        root = etree.Element(param_to_xpath(list(self.inputs_from_xml)[0]).split('/')[1])
-        doc = etree.ElementTree(root)
-
-        # Convert all XML param names to XPaths and add new elements to the tree correspondingly
-        for param in self.inputs_from_xml:
-            if param in inputs:
-                xml_safe_create_element(doc, param_to_xpath(param), inputs[param])
-            elif param in discrete_inputs:
-                xml_safe_create_element(doc, param_to_xpath(param), discrete_inputs[param])
-
-        # Write the tree to an XML file
-        doc.write(file, pretty_print=True, xml_declaration=True, encoding='utf-8')
+        # Stream all XML params to the file, in the order of the input XML template determined during setup
+        if discrete_inputs is None:
+            steps = self._cont_input_write_steps
+        else:
+            steps = self._input_write_steps
+        xml_write_values(file, self._iter_input_values(inputs, discrete_inputs), steps)
 
     def read_outputs_file(self, file, outputs, discrete_outputs=None):
         # type: (Union[str, etree._ElementTree], Vector, Optional[dict]) -> None
@@ -392,52 +533,61 @@ class XMLComponent(ExplicitComponent):
             discrete_outputs : dict
                 Discrete (i.e. not treated as floats) outputs.
         """
-        output_rename_map = self.output_rename_map
-        discrete_output_rename_map = self.discrete_output_rename_map
-
-        # Extract the results from the output xml
-        for xpath, value in xml_to_dict(file).items():
-            name = xpath_to_param(xpath)
-            if name in self.outputs_from_xml:
-                # Rename output
-                if name in output_rename_map:
-                    name = output_rename_map[name][0]
-                elif name in discrete_output_rename_map:
-                    name = discrete_output_rename_map[name][0]
-
-                if name in outputs:
-                    outputs[name] = value
-                elif discrete_outputs is not None and name in discrete_outputs:
-                    discrete_outputs[name] = value
+        # Extract the results from the output xml while it is being traversed
+        self._store_output_values(xml_iter_values(file, parser), outputs, discrete_outputs)
 
     def read_partials_file(self, file, partials):
-        # type: (Union[str, etree._ElementTree], Vector) -> None
+        # type: (Union[str, bytes, IO], Vector) -> None
         """Read the partials from a given XML file and store them in this `Component`'s variables.
 
+        The file is read element by element and is not validated against the partials XML schema.
+
         Parameters
         ----------
-            file : str or :obj:`etree._ElementTree`
-                Path to or :obj:`etree._ElementTree` of a partials XML file.
+            file : str or bytes or file
+                Path to, contents of, or file object of a partials XML file.
 
             partials : Vector
                 Partials vector of this `Component`.
 
+        Raises
+        ------
+            ValueError
+                If an of or wrt element of the partials XML file lacks its uid.
         """
-        output_rename_map = self.output_rename_map
-
-        _partials = Partials(file)
-        for of, wrts in _partials.get_partials().items():
-            for wrt, val in wrts.items():
-                of = xpath_to_param(of)
-                if of in output_rename_map:
-                    of = output_rename_map[of][0]
+        partial_targets = self._partial_targets
+
+        # Like Partials, also accept the contents of a partials XML file instead of a path
+        if isinstance(file, string_types + (binary_type, )):
+            content = file.encode('utf-8') if isinstance(file, text_type) else file
+            if content[:1] == b'<':
+                file = io.BytesIO(content)
+
+        # Stream the values from the file, without building and validating a complete Partials object
+        of = None
+        for _, elem in etree.iterparse(file, events=('end',), tag=('uid', 'wrt', 'of')):
+            if elem.tag == 'uid':
+                if elem.getparent().tag == 'of' and elem.text is not None:
+                    # Compare params rather than UIDs, such that equivalent XPaths (e.g. quoted differently) match
+                    of = xpath_to_param(elem.text)
+                continue
+
+            if elem.tag == 'wrt':
+                uid = elem.find('uid')
+                if of is None or uid is None or uid.text is None:
+                    raise ValueError('Invalid partials XML file: %s element without uid.' % (
+                        'of' if of is None else 'wrt'))
+                key = partial_targets.get((of, xpath_to_param(uid.text)))
+                if key is not None:
+                    value = elem.find('value')
+                    partials[key] = parse_string(value.text) if value is not None else 0.
+            else:
+                of = None
 
-                wrt = xpath_to_param(wrt)
-                if (of, wrt) in partials:
-                    try:
-                        partials[of, wrt] = val
-                    except Exception as e:
-                        print(e.message)
+            # Remove the handled element and its preceding siblings, such that memory use stays bounded
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
 
     def compute(self, inputs, outputs, discrete_inputs=None, discrete_outputs=None):
         # type: (Vector, Vector, Optional[dict], Optional[dict]) -> None
@@ -458,75 +608,73 @@ class XMLComponent(ExplicitComponent):
                 Discrete (i.e. not treated as floats) output parameters.
         """
 
-        if hasattr(self.discipline, 'execute_fast'):
-            # TODO: Probably this should be in a separate class
-            # Prepare dicts (using xpath as key)
-            input_dict = {}
-            for param in self.inputs_from_xml:
-                if param in inputs:
-                    input_dict[param_to_xpath(param)] = inputs[param]
-                elif param in discrete_inputs:
-                    input_dict[param_to_xpath(param)] = discrete_inputs[param]
-            output_dict = {}
-            # Execute discipline without any ElementTree stuff being involved
-            self.discipline.execute_fast(input_dict, output_dict)
-            # Convert outputs
-            output_rename_map = self.output_rename_map
-            discrete_output_rename_map = self.discrete_output_rename_map
-            for xpath, value in output_dict.items():
-                name = xpath_to_param(xpath)
-                if name in self.outputs_from_xml:
-                    if name in output_rename_map:
-                        name = output_rename_map[name][0]
-                    elif name in discrete_output_rename_map:
-                        name = discrete_output_rename_map[name][0]
-                    if name in outputs:
-                        outputs[name] = value
-                    elif discrete_outputs is not None and name in discrete_outputs:
-                        discrete_outputs[name] = value
-        elif not self.keep_files:
-            # Prepare inputs
-            input_xml = io.BytesIO()
-            output_xml = io.BytesIO()
-            if self.inputs_from_xml:
-                self.write_input_file(input_xml, inputs, discrete_inputs)
-                if self.base_file is not None:
-                    input_xml.seek(0)
-                    input_xml_tree = etree.parse(input_xml, parser)
-                    xml_merge(self.base_file, input_xml_tree)
+        self._compute_impl(inputs, outputs, discrete_inputs, discrete_outputs)
+
+    def _compute_fast(self, inputs, outputs, discrete_inputs=None, discrete_outputs=None):
+        # type: (Vector, Vector, Optional[dict], Optional[dict]) -> None
+        """Execute the discipline on dicts of values, without any XML files being involved."""
+        # TODO: Probably this should be in a separate class
+        # Prepare dicts (using xpath as key)
+        input_dict = dict(self._iter_input_values(inputs, discrete_inputs))
+        output_dict = {}
+        # Execute discipline without any ElementTree stuff being involved
+        self.discipline.execute_fast(input_dict, output_dict)
+        # Convert outputs
+        self._store_output_values(output_dict.items(), outputs, discrete_outputs)
+
+    def _compute_membuf(self, inputs, outputs, discrete_inputs=None, discrete_outputs=None):
+        # type: (Vector, Vector, Optional[dict], Optional[dict]) -> None
+        """Execute the discipline on in-memory in- and output XML files."""
+        # Reuse the same in-memory files for every execution
+        output_xml = self._output_buf
+        output_xml.seek(0)
+        output_xml.truncate()
+        if self.base_file is not None:
+            # Merge the input values straight into the base file, which is then used as input XML file
+            if self._input_xpath_table:
+                xml_merge(self.base_file, self.get_input_values(inputs, discrete_inputs))
             # Call execute
-            if self.base_file is not None:
-                self.execute(self.base_file, output_xml)
-            else:
-                input_xml.seek(0)
-                self.execute(input_xml, output_xml)
-            # Assemble outputs
-            output_xml.seek(0)
-            output_xml_tree = etree.parse(output_xml, parser)
-            if self.base_file is not None:
-                xml_merge(self.base_file, output_xml_tree)
-            if self.outputs_from_xml:
-                self.read_outputs_file(output_xml_tree, outputs, discrete_outputs)
+            self.execute(self.base_file, output_xml)
         else:
             # Prepare inputs
-            input_xml, output_xml, _ = self.generate_file_names()
-            if self.inputs_from_xml:
+            input_xml = self._input_buf
+            input_xml.seek(0)
+            input_xml.truncate()
+            if self._input_xpath_table:
                 self.write_input_file(input_xml, inputs, discrete_inputs)
-                if self.base_file is not None:
-                    xml_merge(self.base_file, input_xml)
             # Call execute
+            input_xml.seek(0)
+            self.execute(input_xml, output_xml)
+        # Assemble outputs
+        output_xml.seek(0)
+        output_xml_tree = etree.parse(output_xml, parser)
+        if self.base_file is not None:
+            xml_merge(self.base_file, output_xml_tree)
+        if self._output_dispatch:
+            self.read_outputs_file(output_xml_tree, outputs, discrete_outputs)
+
+    def _compute_tempfile(self, inputs, outputs, discrete_inputs=None, discrete_outputs=None):
+        # type: (Vector, Vector, Optional[dict], Optional[dict]) -> None
+        """Execute the discipline on in- and output XML files which are kept in the data folder."""
+        # Prepare inputs
+        input_xml, output_xml, _ = self.generate_file_names()
+        if self._input_xpath_table:
+            self.write_input_file(input_xml, inputs, discrete_inputs)
             if self.base_file is not None:
-                self.execute(self.base_file, output_xml)
-            else:
-                self.execute(input_xml, output_xml)
-            # Assemble outputs
-            if self.base_file is not None:
-                xml_merge(self.base_file, output_xml)
-            if self.outputs_from_xml:
-                self.read_outputs_file(output_xml, outputs, discrete_outputs)
-
-    def compute_partials_function(self, inputs, partials):
-        # type: (Vector, Vector) -> None
+                xml_merge(self.base_file, self.get_input_values(inputs, discrete_inputs))
+        # Call execute
+        if self.base_file is not None:
+            self.execute(self.base_file, output_xml)
+        else:
+            self.execute(input_xml, output_xml)
+        # Assemble outputs
+        if self.base_file is not None:
+            xml_merge(self.base_file, output_xml)
+        if self._output_dispatch:
+            self.read_outputs_file(output_xml, outputs, discrete_outputs)
+
+    def compute_partials_function(self, inputs, partials, discrete_inputs=None):
+        # type: (Vector, Vector, Optional[dict]) -> None
         """Write the input XML file, call `linearize()`, and read the sensitivities from the resulting XML file.
 
         Parameters
@@ -536,11 +684,14 @@ class XMLComponent(ExplicitComponent):
 
             partials: `Vector`
                 Partials.
+
+            discrete_inputs : `dict`
+                Discrete (i.e. not treated as floats) input parameters.
         """
         if self.partials_from_xml:
             input_xml, _, partials_xml = self.generate_file_names()
 
-            self.write_input_file(input_xml, inputs)
+            self.write_input_file(input_xml, inputs, discrete_inputs)
             self.linearize(input_xml, partials_xml)
 
             if not self.keep_files:
@@ -575,18 +726,16 @@ class XMLComponent(ExplicitComponent):
             aliases : list of str, optional
                 List of aliases (promoted names) to give the `IndepVarComp`s.
         """
-        if len(params) != len(values) or (aliases is None and len(params) != len(aliases)):
+        if len(params) != len(values) or (aliases is not None and len(params) != len(aliases)):
             raise ValueError('number of params, values and optionally aliases needs to be the same')
 
         for param in params:
             if param not in self.inputs_from_xml:
                 raise ValueError('at least one param given is not a param of this XMLComponent (%s)' % param)
 
-        for index, param in enumerate(params):
-            if aliases is None:
-                alias = 'INDEP_' + param_to_xpath(param).split('/')[-1].split('[')[0]
-            else:
-                alias = aliases[index]
+        if aliases is None:
+            aliases = ['INDEP_' + re_xpath_tail.search(param_to_xpath(param)).group(1) for param in params]
 
-            group.add(alias, IndepVarComp(alias, val=values[index]), promotes=[alias])
+        for param, value, alias in zip(params, values, aliases):
+            group.add_subsystem(alias, IndepVarComp(alias, val=value), promotes=[alias])
             group.connect(alias, param)
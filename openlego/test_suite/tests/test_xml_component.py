@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Copyright 2018 D. de Vries
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+This file contains the definition of the test case for the XMLComponent class.
+"""
+from __future__ import absolute_import, division, print_function
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from lxml import etree
+from openmdao.api import Problem, Group
+
+from openlego.core.xml_component import XMLComponent
+from openlego.partials.partials import Partials
+from openlego.utils.xml_utils import xml_to_dict, xml_write_values, xpath_to_param
+
+
+input_xml = '<root><x>2.</x><y>3.</y></root>'
+output_xml = '<root><x>0.</x><z>0.</z></root>'
+partials_xml = '<partials>' \
+               '<of><uid>/root/z</uid>' \
+               '<wrt><uid>/root/x</uid><value>4.</value></wrt>' \
+               '<wrt><uid>/root/y</uid><value>5.</value></wrt>' \
+               '</of>' \
+               '</partials>'
+
+
+class SimpleXMLComponent(XMLComponent):
+    """Minimal `XMLComponent` which does not wrap a discipline."""
+
+    discipline = None
+
+    def execute(self, input_xml=None, output_xml=None):
+        values = xml_to_dict(etree.parse(input_xml))
+        x, y = values['/root/x'], values['/root/y']
+        xml_write_values(output_xml, [('/root/x', x), ('/root/z', x * y)])
+
+    def linearize(self, input_xml=None, partials_xml=None):
+        self.linearized_inputs = values = xml_to_dict(input_xml)
+        partials = Partials()
+        partials.declare_partials('/root/z', ['/root/x', '/root/y'], [values['/root/y'], values['/root/x']])
+        partials.write(partials_xml)
+
+
+class TestXMLComponent(unittest.TestCase):
+
+    def setUp(self):
+        self.data_folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_folder)
+
+    def test_set_inputs_from_xml(self):
+        component = SimpleXMLComponent(input_xml, output_xml)
+        x, name = xpath_to_param('/root/x'), xpath_to_param('/root/name')
+        self.assertIn(x, component.output_rename_map)
+
+        # Replacing the inputs should also replace everything derived from them
+        component.set_inputs_from_xml('<root><y>3.</y><name>abc</name></root>')
+        self.assertEqual(component.output_rename_map, {})
+        self.assertIn(name, component._classified[1])
+
+        prob = Problem(Group())
+        prob.model.add_subsystem('component', component)
+        prob.setup()
+        self.assertEqual(prob['component.' + name], 'abc')
+
+    def test_setup_ungrouped_inputs(self):
+        component = SimpleXMLComponent('<root><a><b>1.</b></a><c>2.</c><a><d>3.</d></a></root>', output_xml)
+        self.assertEqual(list(component.inputs_from_xml),
+                         [xpath_to_param(xpath) for xpath in ('/root/a[1]/b', '/root/c', '/root/a[2]/d')])
+
+        # Input XPaths which are not grouped by their parents cannot be written to an input file
+        component.inputs_from_xml[xpath_to_param('/root/a[1]/e')] = 4.
+        prob = Problem(Group())
+        prob.model.add_subsystem('component', component)
+        with self.assertRaises(ValueError):
+            prob.setup()
+
+    def test_read_partials_file(self):
+        component = SimpleXMLComponent(input_xml, output_xml, partials_xml)
+        prob = Problem(Group())
+        prob.model.add_subsystem('component', component)
+        prob.setup()
+
+        x, y, z = xpath_to_param('/root/x'), xpath_to_param('/root/y'), xpath_to_param('/root/z')
+        for content in (partials_xml, partials_xml.encode('utf-8')):
+            partials = {}
+            component.read_partials_file(content, partials)
+            self.assertEqual(partials, {(z, x): 4., (z, y): 5.})
+
+        with self.assertRaises(ValueError):
+            component.read_partials_file('<partials><of><uid>/root/z</uid><wrt><value>4.</value></wrt></of></partials>',
+                                         {})
+
+    def test_read_partials_file_quotes(self):
+        component = SimpleXMLComponent('<root><x uID="a">2.</x></root>', '<root><z uID="b">0.</z></root>',
+                                       '<partials><of><uid>/root/z[@uID="b"]</uid>'
+                                       '<wrt><uid>/root/x[@uID="a"]</uid></wrt></of></partials>')
+        prob = Problem(Group())
+        prob.model.add_subsystem('component', component)
+        prob.setup()
+
+        # UIDs which only differ in their quotes from those of the template still refer to the same partial
+        partials = {}
+        component.read_partials_file("<partials><of><uid>/root/z[@uID='b']</uid>"
+                                     "<wrt><uid>/root/x[@uID='a']</uid><value>4.</value></wrt></of></partials>",
+                                     partials)
+        self.assertEqual(partials, {(xpath_to_param('/root/z[@uID="b"]'), xpath_to_param('/root/x[@uID="a"]')): 4.})
+
+    def test_xml_params_as_indep_vars(self):
+        component = SimpleXMLComponent(input_xml, output_xml)
+        x, y = xpath_to_param('/root/x'), xpath_to_param('/root/y')
+        group = Group()
+        group.add_subsystem('component', component, promotes_inputs=['*'])
+
+        with self.assertRaises(ValueError):
+            component.xml_params_as_indep_vars(group, [x, y], [4., 5.], ['x_alias'])
+
+        component.xml_params_as_indep_vars(group, [x, y], [4., 5.])
+        prob = Problem(group)
+        prob.setup()
+        prob.run_model()
+        self.assertEqual(prob['INDEP_x'], 4.)
+        self.assertEqual(prob['INDEP_y'], 5.)
+        self.assertEqual(prob['component.' + xpath_to_param('/root/z')], 20.)
+
+    def test_compute_partials_with_discrete_inputs(self):
+        component = SimpleXMLComponent('<root><x>2.</x><y>3.</y><name>abc</name></root>', output_xml, partials_xml,
+                                       data_folder=self.data_folder)
+        prob = Problem(Group())
+        prob.model.add_subsystem('component', component)
+        prob.setup()
+
+        x, y, z = xpath_to_param('/root/x'), xpath_to_param('/root/y'), xpath_to_param('/root/z')
+        name = xpath_to_param('/root/name')
+        partials = {}
+        component.compute_partials_function({x: 2., y: 3.}, partials, {name: 'abc'})
+        self.assertEqual(component.linearized_inputs['/root/name'], 'abc')
+        self.assertEqual(partials, {(z, x): 3., (z, y): 2.})
+
+    def test_base_file(self):
+        base_file = os.path.join(self.data_folder, 'base.xml')
+        x, z = xpath_to_param('/root/x'), xpath_to_param('/root/z')
+        for keep_files in (False, True):
+            for existing in (False, True):
+                if existing:
+                    with open(base_file, 'w') as f:
+                        f.write('<root><w>1.</w></root>')
+                elif os.path.exists(base_file):
+                    os.remove(base_file)
+
+                component = SimpleXMLComponent(input_xml, output_xml, data_folder=self.data_folder,
+                                               keep_files=keep_files, base_file=base_file)
+                prob = Problem(Group())
+                prob.model.add_subsystem('component', component)
+                prob.setup()
+                prob['component.' + x] = 4.
+                prob.run_model()
+                self.assertEqual(prob['component.' + z], 12.)
+
+                # The base file holds the latest in- and outputs, next to the data it already held
+                expected = {'/root/x': 4., '/root/y': 3., '/root/z': 12.}
+                if existing:
+                    expected['/root/w'] = 1.
+                self.assertEqual(dict(xml_to_dict(base_file)), expected)
+
+    def test_reuse_buffers(self):
+        class PaddedXMLComponent(SimpleXMLComponent):
+            """Writes a longer output file the first time it is executed."""
+
+            padding = 100
+
+            def execute(self, input_xml=None, output_xml=None):
+                values = xml_to_dict(etree.parse(input_xml))
+                x, y = values['/root/x'], values['/root/y']
+                padding = [('/root/pad[%d]' % (i + 1), 0.) for i in range(self.padding)]
+                xml_write_values(output_xml, [('/root/x', x), ('/root/z', x * y)] + padding)
+                self.padding = 0
+
+        component = PaddedXMLComponent(input_xml, output_xml, data_folder=self.data_folder)
+        prob = Problem(Group())
+        prob.model.add_subsystem('component', component)
+        prob.setup()
+        x, z = xpath_to_param('/root/x'), xpath_to_param('/root/z')
+
+        # The second, shorter, output file should not contain any leftovers of the first one
+        for value in (4., 5.):
+            prob['component.' + x] = value
+            prob.run_model()
+            self.assertEqual(prob['component.' + z], 3. * value)
+
+
+if __name__ == '__main__':
+    unittest.main()
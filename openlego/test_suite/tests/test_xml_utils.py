@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Copyright 2018 D. de Vries
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+This file contains the definition of the test case for the XML utility functions.
+"""
+from __future__ import absolute_import, division, print_function
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+
+from openlego.utils.xml_utils import xml_to_dict, xml_iter_values, xml_write_values, xml_write_steps, xml_merge, \
+    xpath_to_param, param_to_xpath
+
+
+xml_string = '<root>' \
+             '<a uid="x">1.</a>' \
+             '<b><c>2.</c><c>3.</c><c uid="y">4.</c></b>' \
+             '<d mapType="vector">5.;6.</d>' \
+             '<e>text</e>' \
+             '</root>'
+
+
+class TestXMLUtils(unittest.TestCase):
+
+    def test_xml_to_dict(self):
+        _dict = xml_to_dict(xml_string)
+        self.assertEqual(list(_dict.keys()), ['/root/a[@uid="x"]',
+                                              '/root/b/c[1]',
+                                              '/root/b/c[2]',
+                                              '/root/b/c[@uid="y"]',
+                                              '/root/d',
+                                              '/root/e'])
+        self.assertEqual(_dict['/root/a[@uid="x"]'], 1.)
+        self.assertEqual(_dict['/root/b/c[2]'], 3.)
+        np.testing.assert_array_equal(_dict['/root/d'], [5., 6.])
+        self.assertEqual(_dict['/root/e'], 'text')
+
+    def test_xml_iter_values(self):
+        self.assertEqual(list(xml_to_dict(xml_string).keys()),
+                         [xpath for xpath, _ in xml_iter_values(xml_string)])
+        self.assertEqual([xpath for xpath, _ in xml_iter_values('<r><a>1.</a><a x="1">2.</a><a x="1">3.</a></r>')],
+                         ['/r/a[1]', '/r/a[@x="1"][1]', '/r/a[@x="1"][2]'])
+
+    def test_xml_write_values(self):
+        _dict = xml_to_dict(xml_string)
+        steps = list(xml_write_steps(_dict.keys()))
+        self.assertEqual([depth for depth, _ in steps], [0, 1, 2, 2, 1, 1])
+        for _steps in (None, steps):
+            output = io.BytesIO()
+            xml_write_values(output, _dict.items(), _steps)
+            _written = xml_to_dict(output.getvalue())
+            self.assertEqual(list(_written.keys()), list(_dict.keys()))
+            self.assertEqual(_written['/root/b/c[@uid="y"]'], 4.)
+            np.testing.assert_array_equal(_written['/root/d'], [5., 6.])
+            self.assertEqual(_written['/root/e'], 'text')
+
+    def test_xml_write_steps_order(self):
+        # XPaths which are not grouped by their parents cannot be written as a single pass over the file
+        for xpaths in (['/a/b/c', '/a/d', '/a/b/e'], ['/a/b/c', '/a/b'], ['/a/b[2]', '/a/b[1]']):
+            with self.assertRaises(ValueError):
+                list(xml_write_steps(xpaths))
+
+        output = io.BytesIO()
+        xml_write_values(output, [('/a/b[@x="1"][2]', 1.), ('/a/b[3]', 2.), ('/a/c', 3.)])
+        self.assertEqual(list(xml_to_dict(output.getvalue()).items()),
+                         [('/a/b[@x="1"][2]', 1.), ('/a/b[3]', 2.), ('/a/c', 3.)])
+
+    def test_xml_merge_dict(self):
+        folder = tempfile.mkdtemp()
+        try:
+            # A missing base file is created from the root element of the merger, including its attributes
+            base = os.path.join(folder, 'base.xml')
+            xml_merge(base, OrderedDict([('/root[@uid="r"]/a', 1.), ('/root[@uid="r"]/b/c', 2.)]))
+            self.assertEqual(list(xml_to_dict(base).items()), [('/root[@uid="r"]/a', 1.), ('/root[@uid="r"]/b/c', 2.)])
+
+            xml_merge(base, {'/root[@uid="r"]/b/c': 3.})
+            self.assertEqual(list(xml_to_dict(base).items()), [('/root[@uid="r"]/a', 1.), ('/root[@uid="r"]/b/c', 3.)])
+        finally:
+            shutil.rmtree(folder)
+
+    def test_param_conversion(self):
+        for xpath in xml_to_dict(xml_string):
+            param = xpath_to_param(xpath)
+            self.assertEqual(param_to_xpath(param), xpath)
+            self.assertEqual(xpath_to_param(xpath), param)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,6 +19,7 @@ This file contains a set of XML utility functions.
 """
 from __future__ import absolute_import, division, print_function
 
+import itertools
 import json
 import re
 from collections import OrderedDict
@@ -27,7 +28,8 @@ from shutil import copyfile
 import numpy as np
 from lxml import etree
 from six import string_types, binary_type
-from typing import Optional, Union, List
+from six.moves import zip
+from typing import Optional, Union, List, Dict, Iterator, Iterable, Tuple, Any, IO
 
 # Patterns for XML attribute names and values
 pttrn_attr_val = r'([-.0-9:A-Z_a-z]*?)'
@@ -51,7 +53,7 @@ repl_qtm_inv = '?'
 repl_emm_inv = '!'
 
 # Regular expressions to match attributes and indices within valid XPaths
-re_atr = re.compile(r'\[@' + pttrn_attr_name + "=['\"]" + pttrn_attr_val + "['\"]\]")
+re_atr = re.compile(r'\[@' + pttrn_attr_name + r'=[\'"]' + pttrn_attr_val + r'[\'"]\]')
 re_ind = re.compile(r'\[([0-9]+?)\]')
 
 # Regular expressions to match attributes and indices within OpenMDAO variables transformed from xpaths
@@ -59,7 +61,11 @@ re_atr_inv = re.compile(r':_:' + pttrn_attr_val + ':_:' + pttrn_attr_val + r'(?=
 re_ind_inv = re.compile(r':_:_([0-9]+?)(?=/|$)')
 
 parser = etree.XMLParser(remove_blank_text=True, encoding='utf-8')
-find_text = etree.XPath('//text()')
+
+# Memoized results of the XPath <-> parameter name conversions. The same strings are converted over and over again
+# during the execution of an XMLComponent, so each unique string is only converted once per process.
+_xpath_to_param_cache = dict()  # type: Dict[str, str]
+_param_to_xpath_cache = dict()  # type: Dict[str, str]
 
 
 def xpath_to_param(xpath):
@@ -76,12 +82,15 @@ def xpath_to_param(xpath):
         str
             Valid ``OpenMDAO`` parameter name.
     """
-    param = re_atr.sub(repl_atr, xpath)
-    param = re_ind.sub(repl_ind, param)
-    param = param.replace(repl_dot_inv, repl_dot)
-    param = param.replace(repl_str_inv, repl_str)
-    param = param.replace(repl_qtm_inv, repl_qtm)
-    param = param.replace(repl_emm_inv, repl_emm)
+    param = _xpath_to_param_cache.get(xpath)
+    if param is None:
+        param = re_atr.sub(repl_atr, xpath)
+        param = re_ind.sub(repl_ind, param)
+        param = param.replace(repl_dot_inv, repl_dot)
+        param = param.replace(repl_str_inv, repl_str)
+        param = param.replace(repl_qtm_inv, repl_qtm)
+        param = param.replace(repl_emm_inv, repl_emm)
+        _xpath_to_param_cache[xpath] = param
     return param
 
 
@@ -101,12 +110,15 @@ def param_to_xpath(param):
         str
             Corresponding XML XPath.
     """
-    xpath = param.replace(repl_emm, repl_emm_inv)
-    xpath = xpath.replace(repl_qtm, repl_qtm_inv)
-    xpath = xpath.replace(repl_str, repl_str_inv)
-    xpath = xpath.replace(repl_dot, repl_dot_inv)
-    xpath = re_ind_inv.sub(repl_ind_inv, xpath)
-    xpath = re_atr_inv.sub(repl_atr_inv, xpath)
+    xpath = _param_to_xpath_cache.get(param)
+    if xpath is None:
+        xpath = param.replace(repl_emm, repl_emm_inv)
+        xpath = xpath.replace(repl_qtm, repl_qtm_inv)
+        xpath = xpath.replace(repl_str, repl_str_inv)
+        xpath = xpath.replace(repl_dot, repl_dot_inv)
+        xpath = re_ind_inv.sub(repl_ind_inv, xpath)
+        xpath = re_atr_inv.sub(repl_atr_inv, xpath)
+        _param_to_xpath_cache[param] = xpath
     return xpath
 
 
@@ -132,68 +144,126 @@ def value_to_xml(elem, value):
         elem.text = str(value)
 
 
-def xml_to_dict(xml):
-    # type: (Union[str, bytes, etree._ElementTree]) -> OrderedDict
-    """Convert an XML file to a python dictionary with all valued elements as values with their full XPaths as keys.
+def _parse_value(text):
+    # type: (str) -> Any
+    """Convert the text of an XML element into a float, an array, or a string, in that order of preference."""
+    try:
+        return float(text)
+    except ValueError:
+        try:
+            return np.array(text.split(';'), dtype=float)
+        except ValueError:
+            value = str(text)
+            if ';' in value:
+                return np.array(value.split(';'))
+            elif '[' in value:
+                return np.array(json.loads(value))
+            return value
+
+
+def _augmented_tag(elem):
+    # type: (etree._Element) -> str
+    """Return the tag of an element including its attributes, as used in the 'augmented' XPaths of this module."""
+    tag = elem.tag
+    for name, value in elem.items():
+        # Exclude special purpose attribute: mapType
+        if name != 'mapType':
+            tag += r'[@%s="%s"]' % (name, value)
+    return tag
+
+
+def xml_iter_values(xml, xml_parser=None):
+    # type: (Union[str, bytes, etree._ElementTree], Optional[etree.XMLParser]) -> Iterator[Tuple[str, Any]]
+    """Iterate over all valued elements of an XML file, yielding their full XPaths and values in file order.
+
+    The XPaths are constructed during a single pass over the tree, such that each element is visited only once. Use
+    this function instead of `xml_to_dict()` if all valued elements only need to be processed once.
+
+    Only the text directly inside an element counts as its value. Tail text (text following an element's closing tag
+    within its parent, as in mixed content) is not reported, whereas it used to be attributed to the XPath of the
+    element owning it.
 
     Parameters
     ----------
         xml : str or :obj:`etree._ElementTree`
             Path to or `etree._ElementTree` of an XML file.
 
-    Returns
-    -------
-        :obj:`OrderedDict`
-            `OrderedDict` representing the XML file in file order.
+        xml_parser : :obj:`etree.XMLParser`, optional
+            Parser to use if the XML file still needs to be parsed. By default the parser of this module is used.
+
+    Yields
+    ------
+        str
+            'Augmented' XPath of a valued element, including attributes and indices.
+
+        any
+            Value of the element, converted into a float or an array of floats if possible.
     """
+    if xml_parser is None:
+        xml_parser = parser
+
     if isinstance(xml, binary_type):
         xml = xml.decode('utf-8')
     if isinstance(xml, string_types):
         if xml[0] == '<':
             # https://stackoverflow.com/a/18281386
-            xml = etree.ElementTree(etree.fromstring(xml.encode('utf-8'), parser))
+            xml = etree.ElementTree(etree.fromstring(xml.encode('utf-8'), xml_parser))
         else:
-            xml = etree.parse(xml, parser)
-
-    _dict = OrderedDict()
-    for text in find_text(xml):
-        # Construct 'augmented' XPath for this element, including attributes
-        xpath = ''
-        child = text.getparent()
-        while child is not None:
-            parent = child.getparent()
-
-            tag = child.tag
-            for name, value in child.items():
-                # Exclude special purpose attribute: mapType
-                if name != 'mapType':
-                    tag += r'[@%s="%s"]' % (name, value)
-
-            if parent is not None:
-                siblings = parent.findall(tag)
-                if len(siblings) > 1:
-                    tag += '[%d]' % (siblings.index(child) + 1)
-
-            xpath = '/'.join([tag, xpath])
-            child = parent
-
-        # Try to convert the text into a float or a list of floats
-        try:
-            value = float(text)
-        except ValueError:
-            try:
-                value = np.array(text.split(';'), dtype=float)
-            except ValueError:
-                value = str(text)
-                if ';' in value:
-                    value = np.array(value.split(';'))
-                elif '[' in value:
-                    value = np.array(json.loads(value))
+            xml = etree.parse(xml, xml_parser)
+
+    root = xml.getroot() if isinstance(xml, etree._ElementTree) else xml
+
+    stack = [(root, '/' + _augmented_tag(root))]
+    while stack:
+        elem, xpath = stack.pop()
+        if elem.text is not None:
+            yield xpath, _parse_value(elem.text)
+
+        children = list(elem.iterchildren(tag=etree.Element))
+        tags = [_augmented_tag(child) for child in children]
+
+        # Index siblings like findall() would: elements without attributes among all siblings with the same tag, and
+        # elements with attributes among the siblings with the same tag and attributes
+        totals = dict()
+        for child, tag in zip(children, tags):
+            totals[child.tag] = totals.get(child.tag, 0) + 1
+            if tag != child.tag:
+                totals[tag] = totals.get(tag, 0) + 1
+
+        counts = dict()
+        child_xpaths = []
+        for child, tag in zip(children, tags):
+            counts[child.tag] = counts.get(child.tag, 0) + 1
+            if tag != child.tag:
+                counts[tag] = counts.get(tag, 0) + 1
+            if totals[tag] > 1:
+                tag += '[%d]' % counts[tag]
+            child_xpaths.append((child, xpath + '/' + tag))
+
+        # Push in reversed order so the children are visited in file order
+        stack.extend(reversed(child_xpaths))
+
+
+def xml_to_dict(xml, xml_parser=None):
+    # type: (Union[str, bytes, etree._ElementTree], Optional[etree.XMLParser]) -> OrderedDict
+    """Convert an XML file to a python dictionary with all valued elements as values with their full XPaths as keys.
 
-        # Update the dict with this element
-        _dict.update({'/' + xpath[:-1]: value})
+    The values are obtained using `xml_iter_values()`, so tail text is not included.
 
-    return _dict
+    Parameters
+    ----------
+        xml : str or :obj:`etree._ElementTree`
+            Path to or `etree._ElementTree` of an XML file.
+
+        xml_parser : :obj:`etree.XMLParser`, optional
+            Parser to use if the XML file still needs to be parsed. By default the parser of this module is used.
+
+    Returns
+    -------
+        :obj:`OrderedDict`
+            `OrderedDict` representing the XML file in file order.
+    """
+    return OrderedDict(xml_iter_values(xml, xml_parser))
 
 
 def xml_safe_create_element(
@@ -311,13 +381,202 @@ def xml_safe_create_element(
     return elem
 
 
+def _split_xpath_element(element):
+    # type: (str) -> Tuple[str, dict, Optional[int]]
+    """Split a single element of an XPath into its tag, its attributes, and its index.
+
+    Parameters
+    ----------
+        element : str
+            Single element of an XPath, like ``tag[@name="value"][2]``.
+
+    Returns
+    -------
+        str
+            Tag of the element.
+
+        dict
+            Attributes of the element.
+
+        int or None
+            Index (starting at 1) of the element, or `None` if no index is given.
+    """
+    tag = element
+    index = None
+    match_ind = re_ind.search(tag)
+    if match_ind:
+        tag = tag[:match_ind.start()] + tag[match_ind.end():]
+        index = int(match_ind.group(1))
+
+    attrib = {}
+    for match in re_atr.finditer(tag):
+        attrib.update({match.group(1): match.group(2)})
+    if attrib:
+        tag = tag[:tag.index('[')]
+
+    return tag, attrib, index
+
+
+def xml_write_steps(xpaths):
+    # type: (Iterable[str]) -> Iterator[Tuple[int, Tuple[Tuple[str, dict, int], ...]]]
+    """Determine the steps needed to write elements at the given XPaths one after another.
+
+    Each XPath shares its first elements with the XPath before it. Writing an element at that XPath only requires to
+    go back to the deepest shared element, and to open the remaining elements (the tail) from there. Indices are
+    interpreted like `xml_iter_values()` creates them: among all siblings with the same tag for elements without
+    attributes, and among the siblings with the same tag and attributes otherwise.
+
+    Parameters
+    ----------
+        xpaths : iterable of str
+            XPaths of all valued elements, in file order.
+
+    Yields
+    ------
+        int
+            Number of leading elements this XPath shares with the previous one.
+
+        tuple of tuple(str, dict, int)
+            Tag, attributes and number of empty siblings to insert before each element in the tail of this XPath.
+
+    Raises
+    ------
+        ValueError
+            If the XPaths are not in file order, such that an element would have to be written more than once.
+    """
+    previous = []  # type: List[str]
+
+    # For the children of each element in previous: the closed children and the number of children per tag
+    children = [(set(), dict())]  # type: List[Tuple[set, dict]]
+
+    for xpath in xpaths:
+        elements = xpath.split('/')[1:]
+        depth = 0
+        max_depth = min(len(previous), len(elements))
+        while depth < max_depth and previous[depth] == elements[depth]:
+            depth += 1
+        if depth == len(elements):
+            raise ValueError('XPath %s is not in file order: its element has been written already.' % xpath)
+
+        # Close the elements of the previous XPath which are not part of this one
+        del children[depth + 1:]
+        if depth < len(previous):
+            children[depth][0].add(previous[depth])
+
+        tail = []
+        for element in elements[depth:]:
+            closed, counts = children[-1]
+            if element in closed:
+                raise ValueError('XPath %s is not in file order: element %s has been closed already.'
+                                 % (xpath, element))
+
+            tag, attrib, index = _split_xpath_element(element)
+            key = (tag, tuple(sorted(attrib.items()))) if attrib else tag
+            position = counts.get(key, 0) + 1
+            padding = 0
+            if index is not None:
+                if index < position:
+                    raise ValueError('XPath %s is not in file order: element %s has been written already.'
+                                     % (xpath, element))
+                padding = index - position
+            counts[key] = position + padding
+            if attrib:
+                counts[tag] = counts.get(tag, 0) + padding + 1
+
+            tail.append((tag, attrib, padding))
+            children.append((set(), dict()))
+
+        previous = elements
+        yield depth, tuple(tail)
+
+
+def xml_write_values(file, values, steps=None):
+    # type: (Union[str, IO], Iterable[Tuple[str, Any]], Optional[Iterable[tuple]]) -> None
+    """Write an XML file containing the given values at the given XPaths.
+
+    Instead of creating all elements in a tree using `xml_safe_create_element()` and writing that tree afterwards, the
+    file is written element by element, without ever holding the complete tree in memory. For this to work the values
+    should be given in file order, such that all elements sharing a parent follow each other. This is the order in
+    which `xml_iter_values()` and `xml_to_dict()` return them.
+
+    Parameters
+    ----------
+        file : str or file
+            Path to or file object of the XML file to write.
+
+        values : iterable of tuple(str, any)
+            XPaths and values of all valued elements, in file order.
+
+        steps : iterable of tuple(int, tuple), optional
+            Steps obtained from `xml_write_steps()` for the XPaths of the values. Can be given to avoid determining the
+            steps on every call when the same XPaths are written repeatedly.
+
+    Raises
+    ------
+        ValueError
+            If the values are not in file order.
+    """
+    if steps is None:
+        values, xpaths = itertools.tee(values)
+        steps = xml_write_steps(xpath for xpath, _ in xpaths)
+
+    with etree.xmlfile(file, encoding='utf-8') as xf:
+        xf.write_declaration()
+
+        # Stack of the currently opened elements, as [context, has children, indent children]
+        opened = []  # type: List[list]
+
+        def close(depth):
+            while len(opened) > depth:
+                context, has_children, indent = opened.pop()
+                if has_children and indent:
+                    xf.write('\n' + '  ' * len(opened))
+                context.__exit__(None, None, None)
+
+        def open_element(tag, attrib, padding, indent_children):
+            if opened:
+                parent = opened[-1]
+                parent[1] = True
+                indent = '\n' + '  ' * len(opened) if parent[2] else ''
+
+                # Insert empty siblings up to the index of this element
+                for _ in range(padding):
+                    if indent:
+                        xf.write(indent)
+                    xf.write(etree.Element(tag, attrib))
+                if indent:
+                    xf.write(indent)
+
+            context = xf.element(tag, attrib)
+            context.__enter__()
+            opened.append([context, False, indent_children])
+
+        for (_, value), (depth, tail) in zip(values, steps):
+            # Close all opened elements which are not part of this XPath
+            close(depth)
+
+            # Open the remaining elements, the deepest of which holds the value
+            for tag, attrib, padding in tail[:-1]:
+                open_element(tag, attrib, padding, True)
+
+            tag, attrib, padding = tail[-1]
+            elem = etree.Element(tag, attrib)
+            value_to_xml(elem, value)
+            # Elements holding a value do not get indented children, as that would alter their text
+            open_element(tag, elem.attrib, padding, False)
+            xf.write(elem.text)
+
+        close(0)
+
+
 def xml_merge(base, merger, out_file=None):
-    # type: (Union[str, etree._ElementTree], Union[str, etree._ElementTree], Optional[str]) -> None
+    # type: (Union[str, etree._ElementTree], Union[str, etree._ElementTree, dict], Optional[str]) -> None
     """Merge an XML file into another.
 
     First two parameters can be either a path to an XML file or an instance of `etree._ElementTree` corresponding to an
-    XML tree. All content from the merger will be merger into the base. The third parameter is optional. If set, the
-    result of the merger will be written to the file at this path.
+    XML tree. The merger can also be given directly as a dictionary of values with their XPaths as keys, as returned by
+    `xml_to_dict()`. All content from the merger will be merger into the base. The third parameter is optional. If set,
+    the result of the merger will be written to the file at this path.
 
     This function does not return anything. If  base is an instance of `etree._ElementTree` this object will be changed,
     if it is a `str` the file at that location will be changed. However, if ``out_file`` is set, the file at that
@@ -328,8 +587,9 @@ def xml_merge(base, merger, out_file=None):
         base : str or :obj:`etree._ElementTree`
             Path to or `etree._ElementTree` of an XML file into which the merger should be merged.
 
-        merger : str or :obj:`etree._ElementTree`
-            Path to or 'etree._ElementTree` of an XML file which should be merged into the base.
+        merger : str or :obj:`etree._ElementTree` or dict
+            Path to or 'etree._ElementTree` of an XML file, or dictionary of XPaths and values, which should be merged
+            into the base.
 
         out_file : str, optional
             Path to a file into which the result of the merger should be written. If not given, the result will
@@ -343,19 +603,27 @@ def xml_merge(base, merger, out_file=None):
         try:
             doc = etree.parse(base, parser)
         except IOError:
-            if out_file is None:
-                out_file = base
+            if isinstance(merger, dict):
+                if not merger:
+                    return
 
-            if isinstance(merger, string_types):
-                copyfile(merger, out_file)
+                # Start from an empty tree with the root element of the merger
+                tag, attrib, _ = _split_xpath_element(next(iter(merger)).split('/')[1])
+                doc = etree.ElementTree(etree.Element(tag, attrib))
             else:
-                merger.write(out_file, encoding='utf-8', pretty_print=True, xml_declaration=True)
+                if out_file is None:
+                    out_file = base
+
+                if isinstance(merger, string_types):
+                    copyfile(merger, out_file)
+                else:
+                    merger.write(out_file, encoding='utf-8', pretty_print=True, xml_declaration=True)
 
-            return
+                return
     else:
         doc = base
 
-    merger_dict = xml_to_dict(merger)
+    merger_dict = merger if isinstance(merger, dict) else xml_to_dict(merger)
     for xpath, value in merger_dict.items():
         xml_safe_create_element(doc, xpath, value)
 